@@ -21,6 +21,8 @@ import json
 import re
 from typing import Dict, Any, List, Optional
 
+from ..routers._textutil import has_turkish_chars
+
 # OpenAI client (optional)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if OPENAI_API_KEY:
@@ -284,8 +286,7 @@ def _fallback_intent_detection(text: str) -> Dict[str, Any]:
     tlow = t.lower()
 
     # very light language hint
-    tr_chars = set("ıİğĞşŞöÖçÇüÜ")
-    language = "tr" if any(ch in tr_chars for ch in t) else "en"
+    language = "tr" if has_turkish_chars(t) else "en"
 
     # email/search cue words
     email_keywords = ["email", "e-mail", "mail", "mailler", "emailleri", "posta", "mesaj", "mails"]
@@ -0,0 +1,49 @@
+# api/db_async.py
+"""
+psycopg 3 async connection pool for the async routers (threads).
+"""
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from psycopg import AsyncConnection
+from psycopg_pool import AsyncConnectionPool
+
+from .db import PG_DSN, PG_POOL_MIN, PG_POOL_MAX
+
+# DATABASE_URL points at PgBouncer (transaction pooling): server connections
+# change between transactions, so server-side prepared statements are off
+# (prepare_threshold=None also overrides execute(..., prepare=True))
+PG_PGBOUNCER = os.getenv("PG_PGBOUNCER", "0") == "1"
+
+_apool: Optional[AsyncConnectionPool] = None
+
+
+async def open_async_pool() -> AsyncConnectionPool:
+    """Create and open the pool once; safe to call from every request."""
+    global _apool
+    if _apool is None:
+        # Must be created inside the running loop; open(wait=False) lets the
+        # app start even when the database is not reachable yet
+        _apool = AsyncConnectionPool(
+            PG_DSN, min_size=PG_POOL_MIN, max_size=PG_POOL_MAX, open=False,
+            kwargs={"prepare_threshold": None} if PG_PGBOUNCER else None)
+        await _apool.open(wait=False)
+    return _apool
+
+
+async def close_async_pool() -> None:
+    global _apool
+    if _apool is not None:
+        pool, _apool = _apool, None
+        await pool.close()
+
+
+@asynccontextmanager
+async def apg_conn(timeout: Optional[float] = None) -> AsyncIterator[AsyncConnection]:
+    """Borrow a pooled connection; commit on success, roll back on error.
+    timeout caps the wait for a free/working connection (pool default 30 s);
+    it raises PoolTimeout, a psycopg.OperationalError."""
+    pool = await open_async_pool()
+    async with pool.connection(timeout=timeout) as conn:
+        yield conn
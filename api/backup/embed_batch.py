@@ -0,0 +1,80 @@
+# api/embed_batch.py
+"""
+Micro-batching for query embeddings.
+
+Concurrent callers each submit one text; a collector thread waits up to
+EMB_BATCH_WINDOW_MS (or until EMB_BATCH_MAX texts are queued) and sends them
+as a single embeddings.create(input=[...]) call, resolving each caller's future.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Tuple
+
+EMB_BATCH_WINDOW_MS = float(os.getenv("EMB_BATCH_WINDOW_MS", "8"))
+EMB_BATCH_MAX = int(os.getenv("EMB_BATCH_MAX", "32"))
+# Parallel in-flight API calls, so collection continues during a slow request
+EMB_BATCH_FLUSHERS = int(os.getenv("EMB_BATCH_FLUSHERS", "4"))
+EMB_BATCH_TIMEOUT_SEC = float(os.getenv("EMB_BATCH_TIMEOUT_SEC", "30"))
+
+
+class EmbeddingBatcher:
+    def __init__(self, client, model: str):
+        self._client = client
+        self._model = model
+        self._q: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._flushers = ThreadPoolExecutor(
+            max_workers=EMB_BATCH_FLUSHERS, thread_name_prefix="emb-flush")
+        self._started = False
+        self._start_lock = threading.Lock()
+
+    def embed(self, text: str) -> List[float]:
+        """Blocking; returns the embedding for text or raises the API error."""
+        self._ensure_started()
+        fut: Future = Future()
+        self._q.put((text, fut))
+        return fut.result(timeout=EMB_BATCH_TIMEOUT_SEC)
+
+    def _ensure_started(self):
+        if self._started:
+            return
+        with self._start_lock:
+            if not self._started:
+                threading.Thread(target=self._collect, name="emb-batch",
+                                 daemon=True).start()
+                self._started = True
+
+    def _collect(self):
+        window = EMB_BATCH_WINDOW_MS / 1000.0
+        while True:
+            batch = [self._q.get()]
+            deadline = time.monotonic() + window
+            while len(batch) < EMB_BATCH_MAX:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._q.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._flushers.submit(self._flush, batch)
+
+    def _flush(self, batch: List[Tuple[str, Future]]):
+        try:
+            resp = self._client.embeddings.create(
+                model=self._model, input=[t for t, _ in batch])
+            if len(resp.data) != len(batch):
+                raise RuntimeError(
+                    f"embeddings: got {len(resp.data)} vectors for {len(batch)} inputs")
+            for (_, fut), d in zip(batch, resp.data):
+                fut.set_result(d.embedding)
+        except Exception as e:
+            err = e
+        else:
+            err = RuntimeError("embeddings: no vector returned for input")
+        # Never leave a caller blocked until EMB_BATCH_TIMEOUT_SEC
+        for _, fut in batch:
+            if not fut.done():
+                fut.set_exception(err)
@@ -0,0 +1,40 @@
+# api/embed_cache.py
+"""
+Process-local LRU cache for query embeddings, shared by /ask and /search.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+EMB_CACHE_SIZE = int(os.getenv("EMB_CACHE_SIZE", "4096"))
+
+_EMB_CACHE: "OrderedDict[str, List[float]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _key(model: str, query: str) -> str:
+    norm = " ".join((query or "").lower().split())
+    return hashlib.blake2b(f"{model}\x1e{norm}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+def cached_embedding(model: str, query: str, fetch: Callable[[str], Optional[List[float]]]) -> Optional[List[float]]:
+    """
+    Return the embedding for (model, normalized query), calling fetch(query) on a miss.
+    None results are not cached so a transient API error is retried next time.
+    """
+    k = _key(model, query)
+    with _lock:
+        vec = _EMB_CACHE.get(k)
+        if vec is not None:
+            _EMB_CACHE.move_to_end(k)
+            return vec
+    vec = fetch(query)
+    if vec is not None and EMB_CACHE_SIZE > 0:
+        with _lock:
+            _EMB_CACHE[k] = vec
+            _EMB_CACHE.move_to_end(k)
+            while len(_EMB_CACHE) > EMB_CACHE_SIZE:
+                _EMB_CACHE.popitem(last=False)
+    return vec
@@ -2,7 +2,14 @@ from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI(title="MindVault API (dev)")
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse as _DefaultResponse
+except Exception:
+    _DefaultResponse = JSONResponse
+
+# orjson (when installed) encodes every endpoint's response
+app = FastAPI(title="MindVault API (dev)", default_response_class=_DefaultResponse)
 
 # Add CORS middleware
 app.add_middleware(
@@ -38,6 +45,12 @@ app.include_router(agent.router)
 app.include_router(threads.router)
 
 
+@app.on_event("shutdown")
+def _close_db_pool():
+    from .db import close_pool
+    close_pool()
+
+
 @app.get("/")
 def root():
     return JSONResponse({"ok": True, "endpoints": ["/health", "/search", "/ask", "/index", "/ingest", "/agent", "/threads"]})
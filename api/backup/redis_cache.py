@@ -0,0 +1,114 @@
+# api/redis_cache.py
+"""
+Optional Redis response cache (REDIS_URL). Every helper degrades to a no-op
+when Redis is not configured or unreachable, so callers never need to care.
+"""
+import logging
+import os
+from typing import Optional
+
+try:
+    import redis.asyncio as aioredis
+except Exception:
+    aioredis = None
+
+log = logging.getLogger("mindvault.cache")
+
+REDIS_URL = os.getenv("REDIS_URL")
+# Last good value is kept this long for serving when the database is down
+CACHE_STALE_TTL_SEC = int(os.getenv("CACHE_STALE_TTL_SEC", str(24 * 3600)))
+# Per-key write generation ("gen:<key>"), bumped by cache_delete; only needs
+# to outlive the slowest read that fills the cache
+CACHE_GEN_TTL_SEC = 3600
+
+# SETEX fresh + stale copies only if no cache_delete ran since the reader
+# took its generation: a body read before a write is never cached after it
+_SET_IF_GEN = """
+if (redis.call('GET', KEYS[3]) or '0') ~= ARGV[1] then return 0 end
+redis.call('SETEX', KEYS[1], ARGV[2], ARGV[4])
+redis.call('SETEX', KEYS[2], ARGV[3], ARGV[4])
+return 1
+"""
+
+_client = None
+
+
+def _redis():
+    global _client
+    if _client is None and REDIS_URL and aioredis is not None:
+        _client = aioredis.from_url(
+            REDIS_URL, socket_timeout=0.2, socket_connect_timeout=0.2)
+    return _client
+
+
+async def cache_get(key: str) -> Optional[bytes]:
+    r = _redis()
+    if r is None:
+        return None
+    try:
+        return await r.get(key)
+    except Exception as e:
+        log.debug("cache get %s failed: %s", key, e)
+        return None
+
+
+async def cache_get_stale(key: str) -> Optional[bytes]:
+    return await cache_get("stale:" + key)
+
+
+async def cache_generation(key: str) -> Optional[bytes]:
+    """Take before reading the source; pass to cache_set(gen=...)."""
+    r = _redis()
+    if r is None:
+        return None
+    try:
+        return await r.get("gen:" + key) or b"0"
+    except Exception as e:
+        log.debug("cache gen %s failed: %s", key, e)
+        return None
+
+
+async def cache_set(key: str, value: bytes, ttl: int, gen: Optional[bytes] = None) -> None:
+    """Fresh copy for ttl seconds plus a long-lived stale copy for DB outages.
+    With gen (from cache_generation), skipped if the key was invalidated since."""
+    r = _redis()
+    if r is None:
+        return
+    try:
+        if gen is not None:
+            await r.eval(_SET_IF_GEN, 3, key, "stale:" + key, "gen:" + key,
+                         gen, ttl, CACHE_STALE_TTL_SEC, value)
+            return
+        async with r.pipeline(transaction=False) as p:
+            p.setex(key, ttl, value)
+            p.setex("stale:" + key, CACHE_STALE_TTL_SEC, value)
+            await p.execute()
+    except Exception as e:
+        log.debug("cache set %s failed: %s", key, e)
+
+
+async def cache_delete(*keys: str) -> None:
+    # Only the fresh copies; stale ones stay as the outage fallback. The
+    # generation bump stops in-flight reads from re-caching the old value.
+    r = _redis()
+    if r is None or not keys:
+        return
+    try:
+        async with r.pipeline(transaction=True) as p:
+            p.delete(*keys)
+            for k in keys:
+                p.incr("gen:" + k)
+                p.expire("gen:" + k, CACHE_GEN_TTL_SEC)
+            await p.execute()
+    except Exception as e:
+        log.debug("cache delete %s failed: %s", keys, e)
+
+
+async def close_cache() -> None:
+    global _client
+    if _client is not None:
+        client, _client = _client, None
+        try:
+            await client.aclose()
+        except Exception:
+            pass
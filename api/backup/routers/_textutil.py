@@ -0,0 +1,135 @@
+# api/routers/_textutil.py
+"""
+Small text helpers shared by the routers and agents.
+
+Pure string/regex code on the /ask hot path, fully annotated so it can be
+compiled with mypyc (see setup.py); imported as plain Python otherwise.
+"""
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+# Türkçe'ye özgü harfler; tek derlenmiş karakter sınıfı (C seviyesinde tarama)
+_TR_CHARS = re.compile("[ıİğĞşŞöÖçÇüÜ]")
+
+
+def has_turkish_chars(text: str) -> bool:
+    return _TR_CHARS.search(text or "") is not None
+
+
+# Tek geçişlik birleşik desenler (zaman penceresi + "en son" niyeti);
+# hangi kolun eşleştiği isimli gruptan okunur. "latest" kolu lookahead ile
+# "son"u tüketmez, böylece "en son 3 gün" ikisini de yakalar.
+_SCAN_TR = re.compile(
+    r"\bson\s+(?P<n>\d+)\s*(?:(?P<days>gün)|(?P<weeks>hafta)|(?P<months>ay)|(?P<years>yıl))\b"
+    r"|(?P<yesterday>\bdün\b)|(?P<today>\bbugün\b)"
+    r"|(?P<latest>\ben(?=\s+son\b)|\bson(?=\s+(?:posta|email|e-?posta)\b))",
+    re.I,
+)
+_SCAN_EN = re.compile(
+    r"\blast\s+(?P<n>\d+)\s*(?:(?P<days>days?)|(?P<weeks>weeks?)|(?P<months>months?)|(?P<years>years?))\b"
+    r"|(?P<yesterday>\byesterday\b)|(?P<today>\btoday\b)"
+    r"|(?P<latest>\b(?:latest|most\s+recent)\b)",
+    re.I,
+)
+_WS = re.compile(r"\s+")
+
+
+def scan_query(text: str, lang_cfg: str) -> Tuple[Optional[str], Optional[str], str, bool]:
+    """
+    Tek regex geçişi: 'son 3 gün/hafta/...' gibi ifadeleri yakalar, date_from/to üretir ve
+    metinden çıkarır; 'en son' / 'latest' niyetini de aynı taramada işaretler.
+    Tarih aralığını ilk (en soldaki) ifade belirler; hepsi metinden çıkarılır.
+    """
+    rx = _SCAN_TR if lang_cfg == "turkish_unaccent" else _SCAN_EN
+    window: Optional["re.Match[str]"] = None
+    want_latest = False
+    parts: List[str] = []
+    pos = 0
+    for m in rx.finditer(text):
+        if m.group("latest"):
+            want_latest = True
+            continue
+        if window is None:
+            window = m
+        parts.append(text[pos:m.start()])
+        pos = m.end()
+    if window is None:
+        return None, None, _WS.sub(" ", text).strip(), want_latest
+    parts.append(text[pos:])
+
+    now = datetime.now(timezone.utc)
+    if window.group("yesterday"):
+        start = now - timedelta(days=1)
+    elif window.group("today"):
+        start = now
+    else:
+        n = int(window.group("n"))
+        if window.group("days"):
+            start = now - timedelta(days=n)
+        elif window.group("weeks"):
+            start = now - timedelta(weeks=n)
+        elif window.group("months"):
+            start = now - timedelta(days=30*n)
+        else:
+            start = now - timedelta(days=365*n)
+
+    cleaned = " ".join(parts)
+    return start.isoformat(), now.isoformat(), _WS.sub(" ", cleaned).strip(), want_latest
+
+
+def wants_latest(text: str, lang_cfg: str) -> bool:
+    """Sadece 'en son' / 'latest' niyeti (scan_query'nin aynı deseni)."""
+    rx = _SCAN_TR if lang_cfg == "turkish_unaccent" else _SCAN_EN
+    return any(m.group("latest") for m in rx.finditer(text))
+
+
+_FILTER_RE = re.compile(r"\b(from|sender|tag|is):(\"[^\"]+\"|\S+)", re.I)
+
+
+def parse_inline_filters(text: str) -> Tuple[Dict[str, List[str]], str]:
+    """
+    from:hmrc.gov.uk  sender:\"HMRC\"  tag:sent  is:sent|inbox
+    """
+    filters: Dict[str, List[str]] = {"from": [], "sender": [], "tag": [], "is": []}
+
+    def _take(m: "re.Match[str]") -> str:
+        filters[m.group(1).lower()].append(m.group(2).strip("\""))
+        return " "
+
+    cleaned = _FILTER_RE.sub(_take, text)
+    # normalize
+    for key in filters:
+        filters[key] = list(set(filters[key]))
+    return filters, _WS.sub(" ", cleaned).strip()
+
+
+_SENT_SPLIT = re.compile(r"(?<=[.!?])\s+")
+
+
+def limit_sentences(text: str, n: int) -> str:
+    # Çok kaba bir cümle bölme; pratikte yeterli
+    parts = _SENT_SPLIT.split(text.strip())
+    return " ".join(parts[:max(1, n)]).strip()
+
+
+def parse_email_output(text: str) -> Tuple[str, str]:
+    subject, body = "", text
+    lower = text.lower()
+    if "subject:" in lower:
+        parts = text.split("\n")
+        for i, line in enumerate(parts):
+            if line.strip().lower().startswith("subject:"):
+                subject = line.split(":", 1)[1].strip()
+                body_lines: List[str] = []
+                seen = False
+                for j in range(i+1, len(parts)):
+                    if parts[j].strip().lower().startswith("body:"):
+                        seen = True
+                        continue
+                    if seen:
+                        body_lines.append(parts[j])
+                if seen:
+                    body = "\n".join(body_lines).strip()
+                break
+    return subject, body
@@ -0,0 +1,19 @@
+# api/setup.py
+"""
+Optional mypyc build for the text helpers on the /ask hot path.
+
+Run from the directory that contains the `api` package (/app in the image):
+
+    pip install mypy && python api/setup.py build_ext --inplace
+
+The compiled extension is picked up ahead of routers/_textutil.py; without
+it the module is imported as plain Python.
+"""
+from setuptools import setup
+from mypyc.build import mypycify
+
+setup(
+    name="mindvault-api-textutil",
+    packages=[],
+    ext_modules=mypycify(["api/routers/_textutil.py"], opt_level="3"),
+)
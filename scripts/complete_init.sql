@@ -139,6 +139,20 @@ BEGIN
   END IF;
 END$$;
 
+-- Ingest queue (POST /ingest/gmail returns 202; the API worker drains this)
+CREATE TABLE IF NOT EXISTS pending_ingest (
+    content_hash text PRIMARY KEY,
+    payload jsonb NOT NULL,
+    status text NOT NULL DEFAULT 'queued',  -- queued, processing, failed (terminal, out of attempts)
+    attempts int NOT NULL DEFAULT 0,
+    next_attempt_at timestamptz NOT NULL DEFAULT now(),  -- retry backoff
+    error text,
+    created_at timestamptz DEFAULT now(),
+    updated_at timestamptz DEFAULT now()
+);
+ALTER TABLE pending_ingest ADD COLUMN IF NOT EXISTS next_attempt_at timestamptz NOT NULL DEFAULT now();
+CREATE INDEX IF NOT EXISTS idx_pending_ingest_status ON pending_ingest(status, created_at);
+
 -- =============================
 -- Query Logging & Analytics
 -- =============================
@@ -178,6 +192,14 @@ CREATE TABLE IF NOT EXISTS qoutcome (
     created_at timestamptz DEFAULT now()
 );
 
+-- LLM completion cache (/ask), keyed by hash of model + messages + params
+CREATE TABLE IF NOT EXISTS llm_cache (
+    k text PRIMARY KEY,
+    v text NOT NULL,
+    ts timestamptz NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_ts ON llm_cache(ts);
+
 -- =============================
 -- Indexes for Performance
 -- =============================
@@ -187,6 +209,32 @@ CREATE INDEX IF NOT EXISTS idx_documents_ts ON documents(ts DESC);
 CREATE INDEX IF NOT EXISTS idx_documents_source ON documents(source_id);
 CREATE INDEX IF NOT EXISTS idx_documents_kind ON documents(kind);
 CREATE INDEX IF NOT EXISTS idx_documents_content_hash ON documents(content_hash);
+-- Per-source dedupe probe used by /ingest/gmail (and a guard against racing dups).
+-- Existing duplicates are merged into the oldest row first, otherwise the
+-- unique index below would abort the script on an older database.
+CREATE TEMP TABLE _doc_dups AS
+SELECT id AS dup_id, keep_id
+FROM (
+  SELECT id,
+         first_value(id) OVER (PARTITION BY source_id, content_hash
+                               ORDER BY created_at, id) AS keep_id
+  FROM documents
+  WHERE content_hash IS NOT NULL
+) d
+WHERE id <> keep_id;
+
+INSERT INTO document_tags (document_id, tag_id)
+SELECT x.keep_id, dt.tag_id
+FROM document_tags dt JOIN _doc_dups x ON x.dup_id = dt.document_id
+ON CONFLICT DO NOTHING;
+
+UPDATE qresults q SET document_id = x.keep_id
+FROM _doc_dups x WHERE q.document_id = x.dup_id;
+
+DELETE FROM documents d USING _doc_dups x WHERE d.id = x.dup_id;
+DROP TABLE _doc_dups;
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_documents_source_content_hash ON documents(source_id, content_hash);
 
 -- Full-text search index (multilingual with unaccent)
 CREATE INDEX IF NOT EXISTS idx_documents_fts_simple
@@ -196,6 +244,39 @@ ON documents USING gin (
   )
 );
 
+-- Precomputed weighted tsvectors (title A, preview B, body C) per search config;
+-- /search and /ask read these instead of tokenizing every row per query
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS fts_tr tsvector
+  GENERATED ALWAYS AS (
+    setweight(to_tsvector('turkish_unaccent', coalesce(title,'')), 'A') ||
+    setweight(to_tsvector('turkish_unaccent', coalesce(preview,'')), 'B') ||
+    setweight(to_tsvector('turkish_unaccent', coalesce(plain_text,'')), 'C')
+  ) STORED;
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS fts_simple tsvector
+  GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple_unaccent', coalesce(title,'')), 'A') ||
+    setweight(to_tsvector('simple_unaccent', coalesce(preview,'')), 'B') ||
+    setweight(to_tsvector('simple_unaccent', coalesce(plain_text,'')), 'C')
+  ) STORED;
+CREATE INDEX IF NOT EXISTS idx_documents_fts_tr ON documents USING gin (fts_tr);
+CREATE INDEX IF NOT EXISTS idx_documents_fts_simple_col ON documents USING gin (fts_simple);
+
+-- Body length as a plain int: /search tie-breaks on it without detoasting plain_text
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS plain_text_len integer
+  GENERATED ALWAYS AS (length(coalesce(plain_text,''))) STORED;
+
+-- Optional BM25 index (ParadeDB pg_search). /search and /ask detect the
+-- extension at runtime and fall back to ts_rank_cd when it is missing.
+DO $do$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_search') THEN
+    EXECUTE 'CREATE EXTENSION IF NOT EXISTS pg_search';
+    EXECUTE 'CREATE INDEX IF NOT EXISTS idx_documents_bm25 ON documents
+             USING bm25 (id, title, preview, plain_text) WITH (key_field = ''id'')';
+  END IF;
+END
+$do$ LANGUAGE plpgsql;
+
 -- Vector similarity index (IVFFLAT for cosine similarity)
 CREATE INDEX IF NOT EXISTS idx_documents_embedding
 ON documents
@@ -209,6 +290,27 @@ ON document_chunks
 USING ivfflat (embedding vector_cosine_ops)
 WITH (lists = 100);
 
+-- =============================
+-- Half-precision Embeddings (pgvector >= 0.7)
+-- =============================
+-- FP16 copies of the embeddings: half the bytes per vector for scans and
+-- ANN probes. Ingest writes both columns; /search and /ask read the halfvec one.
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS embedding_half halfvec(1536);
+ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS embedding_half halfvec(1536);
+
+-- Backfill rows ingested before the column existed
+UPDATE documents SET embedding_half = embedding::halfvec(1536)
+WHERE embedding IS NOT NULL AND embedding_half IS NULL;
+UPDATE document_chunks SET embedding_half = embedding::halfvec(1536)
+WHERE embedding IS NOT NULL AND embedding_half IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_documents_embedding_half
+ON documents
+USING hnsw (embedding_half halfvec_cosine_ops);
+CREATE INDEX IF NOT EXISTS idx_document_chunks_embedding_half
+ON document_chunks
+USING hnsw (embedding_half halfvec_cosine_ops);
+
 -- Tag relationship indexes
 CREATE INDEX IF NOT EXISTS idx_document_tags_doc ON document_tags(document_id);
 CREATE INDEX IF NOT EXISTS idx_document_tags_tag ON document_tags(tag_id);
@@ -218,6 +320,18 @@ CREATE INDEX IF NOT EXISTS idx_qlog_created_at ON qlog(created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_qresults_qlog ON qresults(qlog_id);
 CREATE INDEX IF NOT EXISTS idx_qresults_document ON qresults(document_id);
 
+-- =============================
+-- Planner Statistics
+-- =============================
+-- Larger most-common-element samples on the stored tsvectors so @@
+-- selectivity estimates pick the GIN path for the lexical search branch.
+ALTER TABLE documents ALTER COLUMN fts_tr SET STATISTICS 1000;
+ALTER TABLE documents ALTER COLUMN fts_simple SET STATISTICS 1000;
+
+-- source_id / kind are correlated (one provider → few kinds)
+CREATE STATISTICS IF NOT EXISTS st_documents_source_kind (ndistinct, dependencies)
+ON source_id, kind FROM documents;
+
 -- =============================
 -- Update Statistics
 -- =============================
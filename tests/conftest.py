@@ -0,0 +1,68 @@
+# tests/conftest.py
+"""
+Shared fixtures: one app import, one event loop and one ASGI client for the
+whole session, with DB start-up work switched off. Thread tests run against
+the real Postgres at PG_DSN and are skipped when it is not reachable.
+"""
+import asyncio
+import os
+
+import httpx
+import psycopg
+import pytest
+import pytest_asyncio
+
+# No schema bootstrap against a real Postgres from the test process
+os.environ.setdefault("MINDVAULT_AUTO_MIGRATE", "0")
+
+from api.routers import threads as _threads  # noqa: E402
+from api.db import PG_DSN  # noqa: E402
+from api.db_async import apg_conn, close_async_pool  # noqa: E402
+
+_init_thread_tables = _threads._init_tables
+
+
+async def _no_init_tables():
+    return None
+
+
+_threads._init_tables = _no_init_tables
+
+from api.main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def event_loop():
+    """One event loop for the whole session, shared by the client fixture."""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+@pytest_asyncio.fixture(scope="session")
+async def client():
+    """In-process client on the ASGI app; no per-request thread/loop start-up."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+@pytest_asyncio.fixture(scope="session")
+async def threads_schema():
+    """chat_threads/chat_messages on PG_DSN; tests needing it skip without Postgres."""
+    try:
+        conn = await psycopg.AsyncConnection.connect(PG_DSN, connect_timeout=2)
+    except psycopg.OperationalError as e:
+        pytest.skip(f"Postgres not reachable: {e}")
+    await conn.close()
+    await _init_thread_tables()
+    yield
+    await close_async_pool()
+
+
+@pytest_asyncio.fixture
+async def threads_db(threads_schema):
+    """Empty thread tables for each test."""
+    async with apg_conn() as conn:
+        await conn.execute("TRUNCATE chat_threads, chat_messages")
+    yield
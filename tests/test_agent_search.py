@@ -3,24 +3,22 @@
 Tests for the agent framework search functionality.
 """
 import pytest
-from fastapi.testclient import TestClient
 import sys
 import os
 
 # Add the api directory to the Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'api'))
 
-from api.main import app
-
-client = TestClient(app)
+# `client` is the session-wide fixture from conftest.py
 
 
+@pytest.mark.asyncio
 class TestAgentSearch:
     """Test cases for the agent search functionality."""
     
-    def test_hmrc_email_search_intent_detection(self):
+    async def test_hmrc_email_search_intent_detection(self, client):
         """Test that HMRC email queries are correctly identified and processed."""
-        response = client.post(
+        response = await client.post(
             "/agent/act",
             json={"text": "HMRC'den gelen en son email neydi?"}
         )
@@ -43,9 +41,9 @@ class TestAgentSearch:
         assert "items" in data["result"]
         assert isinstance(data["result"]["items"], list)
     
-    def test_hmrc_email_search_with_custom_params(self):
+    async def test_hmrc_email_search_with_custom_params(self, client):
         """Test HMRC email search with custom parameters."""
-        response = client.post(
+        response = await client.post(
             "/agent/act",
             json={
                 "text": "show me hmrc email",
@@ -70,9 +68,9 @@ class TestAgentSearch:
         assert "items" in data["result"]
         assert isinstance(data["result"]["items"], list)
     
-    def test_no_matching_agent_fallback(self):
+    async def test_no_matching_agent_fallback(self, client):
         """Test that unrecognized queries return appropriate fallback message."""
-        response = client.post(
+        response = await client.post(
             "/agent/act",
             json={"text": "nonsense query"}
         )
@@ -89,9 +87,9 @@ class TestAgentSearch:
         assert "message" in data["result"]
         assert "No matching agent" in data["result"]["message"]
     
-    def test_agent_endpoint_structure(self):
+    async def test_agent_endpoint_structure(self, client):
         """Test that agent responses have the correct structure."""
-        response = client.post(
+        response = await client.post(
             "/agent/act",
             json={"text": "latest email from HMRC"}
         )
@@ -126,9 +124,9 @@ class TestAgentSearch:
                 if item["url"] is not None:
                     assert isinstance(item["url"], str)
     
-    def test_domain_based_search(self):
+    async def test_domain_based_search(self, client):
         """Test domain-based email search."""
-        response = client.post(
+        response = await client.post(
             "/agent/act",
             json={"text": "latest email from wearedjr.com"}
         )
@@ -147,9 +145,9 @@ class TestAgentSearch:
         assert "items" in data["result"]
         assert isinstance(data["result"]["items"], list)
     
-    def test_date_window_search(self):
+    async def test_date_window_search(self, client):
         """Test date window functionality."""
-        response = client.post(
+        response = await client.post(
             "/agent/act",
             json={"text": "last 3 days emails"}
         )
@@ -166,9 +164,9 @@ class TestAgentSearch:
         assert "result" in data
         assert "items" in data["result"]
     
-    def test_search_find_general_query(self):
+    async def test_search_find_general_query(self, client):
         """Test search.find agent with general search query."""
-        response = client.post(
+        response = await client.post(
             "/agent/act",
             json={"text": "proje raporu ara"}
         )
@@ -189,9 +187,9 @@ class TestAgentSearch:
         assert "has_more" in data["result"]
         assert isinstance(data["result"]["items"], list)
     
-    def test_search_find_english_keywords(self):
+    async def test_search_find_english_keywords(self, client):
         """Test search.find with English keyword extraction."""
-        response = client.post(
+        response = await client.post(
             "/agent/act",
             json={"text": "search for meeting notes about quarterly review"}
         )
@@ -214,9 +212,9 @@ class TestAgentSearch:
         assert "items" in data["result"]
         assert isinstance(data["result"]["items"], list)
     
-    def test_search_find_date_window(self):
+    async def test_search_find_date_window(self, client):
         """Test search.find with date window functionality."""
-        response = client.post(
+        response = await client.post(
             "/agent/act",
             json={"text": "son 7 günde gelen belgeler"}
         )
@@ -234,9 +232,9 @@ class TestAgentSearch:
         assert "items" in data["result"]
         assert "total" in data["result"]
     
-    def test_request_with_optional_fields(self):
+    async def test_request_with_optional_fields(self, client):
         """Test request with optional thread_id and confirm fields."""
-        response = client.post(
+        response = await client.post(
             "/agent/act",
             json={
                 "text": "latest email from HMRC",
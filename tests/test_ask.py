@@ -0,0 +1,121 @@
+# tests/test_ask.py
+"""
+Smoke tests for /ask and /ask/stream: the real retrieval SQL builder runs
+against a fake connection, so no Postgres or OpenAI is needed.
+"""
+from contextlib import contextmanager
+
+import pytest
+
+from api.routers import ask
+
+DOCS = [
+    {"id": "d1", "provider": "gmail", "title": "HMRC letter", "preview": "Tax return due",
+     "plain_text": "Your tax return is due. Please file it.", "ts": None, "url": None},
+]
+
+
+class _FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.sql = None
+        self.params = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.sql, self.params = sql, params
+
+    def fetchall(self):
+        return [dict(r) for r in self.rows]
+
+
+class _FakeConn:
+    def __init__(self, rows):
+        self.cur = _FakeCursor(rows)
+
+    def cursor(self, **kwargs):
+        return self.cur
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    conns = []
+
+    def _use(rows):
+        @contextmanager
+        def _pg_conn():
+            conn = _FakeConn(rows)
+            conns.append(conn)
+            yield conn
+        monkeypatch.setattr(ask, "pg_conn", _pg_conn)
+        return conns
+
+    monkeypatch.setattr(ask, "has_extension", lambda name: False)
+    monkeypatch.setattr(ask, "oai", None)
+    monkeypatch.setattr(ask, "_emb_batcher", None)
+    return _use
+
+
+@pytest.mark.asyncio
+class TestAsk:
+
+    async def test_ask_summary_uses_retrieved_docs(self, client, fake_db):
+        conns = fake_db(DOCS)
+        response = await client.post("/ask", json={"query": "latest tax letter", "language": "en"})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["used_ids"] == ["d1"]
+        assert data["sources"][0]["title"] == "HMRC letter"
+        assert data["answer"]
+        # Lexical branch + RRF fusion went to the database in one query
+        assert "lex_cand" in conns[0].cur.sql and "fused" in conns[0].cur.sql
+
+    async def test_ask_without_docs_falls_back(self, client, fake_db):
+        fake_db([])
+        response = await client.post("/ask", json={"query": "nothing here", "language": "en"})
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "answer": "No matching documents found.", "used_ids": [], "sources": [],
+            "subject": None, "body": None, "format": None,
+        }
+
+    async def test_ask_email_mode(self, client, fake_db):
+        fake_db(DOCS)
+        response = await client.post("/ask", json={"query": "reply to HMRC", "mode": "email", "language": "en"})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["format"] == "email"
+        assert data["subject"]
+
+    async def test_ask_stream_events(self, client, fake_db):
+        fake_db([])
+        response = await client.post("/ask/stream", json={"query": "hiçbir şey", "language": "tr"})
+
+        assert response.status_code == 200
+        body = response.text
+        assert body.startswith("event: sources\n")
+        assert "Eşleşen doküman bulunamadı." in body
+        assert body.rstrip().endswith("event: done\ndata: {}")
+
+    async def test_latest_inside_inline_filter_orders_by_date(self, client, fake_db):
+        # want_latest is read from the whole query, inline filter values included
+        conns = fake_db(DOCS)
+        response = await client.post("/ask", json={"query": "from:latest-news invoice", "language": "en"})
+
+        assert response.status_code == 200
+        assert "ORDER BY d.ts DESC, f.score DESC" in conns[0].cur.sql
+        assert conns[0].cur.params["from_0"] == "%latest-news%"
+
+    async def test_plain_query_orders_by_score(self, client, fake_db):
+        conns = fake_db(DOCS)
+        await client.post("/ask", json={"query": "invoice", "language": "en"})
+
+        assert "ORDER BY f.score DESC, d.ts DESC" in conns[0].cur.sql
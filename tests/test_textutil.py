@@ -0,0 +1,40 @@
+# tests/test_textutil.py
+"""
+Pure /ask text helpers (routers/_textutil.py); no app or database needed.
+"""
+from datetime import datetime, timedelta
+
+from api.routers._textutil import scan_query
+
+
+def _days(date_from, date_to):
+    return (datetime.fromisoformat(date_to) - datetime.fromisoformat(date_from)).days
+
+
+class TestScanQuery:
+
+    def test_every_window_phrase_is_removed_first_sets_range(self):
+        date_from, date_to, cleaned, latest = scan_query(
+            "faturalar son 2 gün ve son 1 hafta", "turkish_unaccent")
+
+        assert cleaned == "faturalar ve"
+        assert _days(date_from, date_to) == 2
+        assert latest is False
+
+    def test_latest_and_window_in_one_scan(self):
+        date_from, date_to, cleaned, latest = scan_query("en son 3 gün mail", "turkish_unaccent")
+
+        assert latest is True
+        assert _days(date_from, date_to) == 3
+        assert cleaned == "en mail"
+
+    def test_english_window_and_latest(self):
+        date_from, date_to, cleaned, latest = scan_query(
+            "latest invoices last 2 weeks or yesterday", "english")
+
+        assert latest is True
+        assert datetime.fromisoformat(date_to) - datetime.fromisoformat(date_from) == timedelta(weeks=2)
+        assert cleaned == "latest invoices or"
+
+    def test_no_window(self):
+        assert scan_query("  tax   letter ", "english") == (None, None, "tax letter", False)
@@ -0,0 +1,424 @@
+# tests/test_threads.py
+"""
+/threads behaviour against a real Postgres (see conftest.threads_db).
+"""
+import uuid
+from datetime import datetime
+
+import time
+from contextlib import asynccontextmanager
+
+import psycopg
+import pytest
+from psycopg_pool import AsyncConnectionPool
+
+from api import redis_cache
+from api.db_async import apg_conn
+from api.routers import threads
+
+pytestmark = pytest.mark.usefixtures("threads_db")
+
+
+class _FakePipeline:
+    """Commands apply straight away; fine for a single-threaded test."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+
+    def delete(self, *keys):
+        for k in keys:
+            self.data.pop(k, None)
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, b"0")) + 1).encode()
+
+    def expire(self, key, ttl):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self):
+        return []
+
+
+class _FakeRedis(_FakePipeline):
+    """The slice of redis.asyncio the cache helpers use; TTLs are ignored."""
+
+    def __init__(self):
+        super().__init__({})
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self.data)
+
+    async def eval(self, script, numkeys, *args):
+        # Only redis_cache._SET_IF_GEN is used
+        (key, stale_key, gen_key), (gen, ttl, stale_ttl, value) = args[:3], args[3:]
+        if self.data.get(gen_key, b"0") != gen:
+            return 0
+        self.data[key] = self.data[stale_key] = value
+        return 1
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    r = _FakeRedis()
+    monkeypatch.setattr(redis_cache, "_client", r)
+    return r
+
+
+async def _new_thread(client, title=None):
+    body = {} if title is None else {"title": title}
+    response = await client.post("/threads", json=body)
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.asyncio
+class TestMessagesBatch:
+
+    async def test_batch_keeps_order(self, client):
+        thread = await _new_thread(client)
+        batch = [{"content": f"m{i}", "type": "user" if i % 2 == 0 else "assistant"}
+                 for i in range(5)]
+
+        response = await client.post(f"/threads/{thread['id']}/messages:batch", json=batch)
+
+        assert response.status_code == 200
+        created = response.json()
+        assert [m["content"] for m in created] == ["m0", "m1", "m2", "m3", "m4"]
+        assert all(m["thread_id"] == thread["id"] for m in created)
+        stamps = [m["timestamp"] for m in created]
+        assert stamps == sorted(stamps)
+
+        stored = (await client.get(f"/threads/{thread['id']}")).json()["messages"]
+        assert [m["id"] for m in stored] == [m["id"] for m in created]
+
+    async def test_batch_sets_default_title_from_first_user_message(self, client):
+        thread = await _new_thread(client)
+        long_text = "x" * 60
+        batch = [{"content": "hello", "type": "assistant"},
+                 {"content": long_text, "type": "user"},
+                 {"content": "second user", "type": "user"}]
+
+        await client.post(f"/threads/{thread['id']}/messages:batch", json=batch)
+
+        title = (await client.get(f"/threads/{thread['id']}")).json()["title"]
+        assert title == "x" * 47 + "..."
+
+    async def test_batch_keeps_custom_title(self, client):
+        thread = await _new_thread(client, "Taxes")
+
+        await client.post(f"/threads/{thread['id']}/messages:batch",
+                          json=[{"content": "hi", "type": "user"}])
+
+        assert (await client.get(f"/threads/{thread['id']}")).json()["title"] == "Taxes"
+
+    @pytest.mark.parametrize("thread_id", [str(uuid.uuid4()), "not-a-uuid"])
+    async def test_batch_unknown_thread_is_404(self, client, thread_id):
+        response = await client.post(f"/threads/{thread_id}/messages:batch",
+                                     json=[{"content": "hi", "type": "user"}])
+
+        assert response.status_code == 404
+
+    async def test_batch_empty_is_400(self, client):
+        thread = await _new_thread(client)
+
+        response = await client.post(f"/threads/{thread['id']}/messages:batch", json=[])
+
+        assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+class TestThreadsListETag:
+
+    async def test_repeat_request_is_304(self, client):
+        await _new_thread(client, "One")
+        first = await client.get("/threads")
+        etag = first.headers["etag"]
+
+        again = await client.get("/threads", headers={"If-None-Match": etag})
+
+        assert first.status_code == 200
+        assert again.status_code == 304
+        assert again.headers["etag"] == etag
+        assert again.content == b""
+
+    async def test_write_changes_etag(self, client):
+        thread = await _new_thread(client, "One")
+        etag = (await client.get("/threads")).headers["etag"]
+
+        await client.post(f"/threads/{thread['id']}/messages",
+                          json={"content": "hi", "type": "user"})
+        response = await client.get("/threads", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json()[0]["message_count"] == 1
+
+    async def test_write_outside_router_changes_etag(self, client):
+        # A message deleted straight in the database leaves updated_at alone
+        thread = await _new_thread(client, "One")
+        await client.post(f"/threads/{thread['id']}/messages",
+                          json={"content": "hi", "type": "user"})
+        etag = (await client.get("/threads")).headers["etag"]
+
+        async with apg_conn() as conn:
+            await conn.execute("DELETE FROM chat_messages")
+        response = await client.get("/threads", headers={"If-None-Match": etag})
+
+        assert response.status_code == 200
+        assert response.json()[0]["message_count"] == 0
+
+
+@pytest.mark.asyncio
+class TestThreadsCache:
+
+    async def test_list_is_cached_and_dropped_on_create(self, client, fake_redis):
+        await _new_thread(client, "One")
+        await client.get("/threads")
+        assert threads._LIST_KEY in fake_redis.data
+        assert threads._LIST_ETAG_KEY in fake_redis.data
+
+        await _new_thread(client, "Two")
+
+        assert threads._LIST_KEY not in fake_redis.data
+        titles = [t["title"] for t in (await client.get("/threads")).json()]
+        assert sorted(titles) == ["One", "Two"]
+
+    async def test_read_racing_a_write_is_not_cached(self, client, fake_redis, monkeypatch):
+        thread = await _new_thread(client, "One")
+        real_chunks = threads._threads_json_chunks
+
+        async def _chunks_with_concurrent_write():
+            async for chunk in real_chunks():
+                yield chunk
+            # A write commits and invalidates after the list was read
+            await threads.cache_delete(*threads._LIST_KEYS, threads._item_key(thread["id"]))
+        monkeypatch.setattr(threads, "_threads_json_chunks", _chunks_with_concurrent_write)
+
+        await client.get("/threads")
+
+        assert threads._LIST_KEY not in fake_redis.data
+        assert threads._LIST_ETAG_KEY not in fake_redis.data
+
+    async def test_cached_etag_answers_304(self, client, fake_redis):
+        await _new_thread(client, "One")
+        etag = (await client.get("/threads")).headers["etag"]
+        fake_redis.data[threads._LIST_KEY] = b"not used"
+
+        response = await client.get("/threads", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+
+    async def test_thread_cache_dropped_on_each_write(self, client, fake_redis):
+        thread = await _new_thread(client)
+        key = threads._item_key(thread["id"])
+        writes = [
+            ("post", f"/threads/{thread['id']}/messages", {"content": "a", "type": "user"}),
+            ("post", f"/threads/{thread['id']}/messages:batch", [{"content": "b", "type": "user"}]),
+            ("put", f"/threads/{thread['id']}", {"title": "Renamed"}),
+        ]
+        for method, url, body in writes:
+            await client.get(f"/threads/{thread['id']}")
+            assert key in fake_redis.data
+
+            await client.request(method, url, json=body)
+
+            assert key not in fake_redis.data
+            assert threads._LIST_KEY not in fake_redis.data
+
+        fresh = (await client.get(f"/threads/{thread['id']}")).json()
+        assert fresh["title"] == "Renamed"
+        assert [m["content"] for m in fresh["messages"]] == ["a", "b"]
+
+        await client.delete(f"/threads/{thread['id']}")
+        assert key not in fake_redis.data
+        assert (await client.get(f"/threads/{thread['id']}")).status_code == 404
+
+    async def test_stale_copy_served_when_db_is_down(self, client, fake_redis, monkeypatch):
+        thread = await _new_thread(client, "One")
+        await client.get(f"/threads/{thread['id']}")
+        await client.get("/threads")
+        for key in (threads._item_key(thread["id"]), *threads._LIST_KEYS):
+            fake_redis.data.pop(key)
+
+        # A pool that can never connect: the read must give up after
+        # THREADS_READ_TIMEOUT_SEC, not the pool's 30 s default
+        pool = AsyncConnectionPool("postgresql://postgres@127.0.0.1:1/none", open=False,
+                                   reconnect_timeout=60)
+        await pool.open(wait=False)
+
+        @asynccontextmanager
+        async def _down(timeout=None):
+            async with pool.connection(timeout=timeout) as conn:
+                yield conn
+        monkeypatch.setattr(threads, "apg_conn", _down)
+        monkeypatch.setattr(threads, "THREADS_READ_TIMEOUT_SEC", 0.3)
+        started = time.monotonic()
+        try:
+            response = await client.get(f"/threads/{thread['id']}")
+            list_response = await client.get("/threads")
+        finally:
+            await pool.close()
+
+        assert time.monotonic() - started < 5
+        assert list_response.status_code == 200
+        assert list_response.headers["warning"] == '110 - "Response is Stale"'
+        assert response.status_code == 200
+        assert response.headers["warning"] == '110 - "Response is Stale"'
+        assert response.json()["title"] == "One"
+
+
+@pytest.mark.asyncio
+class TestThreadsListStream:
+
+    async def test_empty_list(self, client):
+        response = await client.get("/threads")
+
+        assert response.status_code == 200
+        assert response.json() == []
+
+    async def test_list_spans_several_cursor_batches(self, client, monkeypatch):
+        monkeypatch.setattr(threads, "THREADS_STREAM_BATCH", 2)
+        for i in range(5):
+            await _new_thread(client, f"t{i}")
+
+        response = await client.get("/threads")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        data = response.json()
+        # Most recently updated first; summaries only, no messages
+        assert [t["title"] for t in data] == ["t4", "t3", "t2", "t1", "t0"]
+        assert set(data[0]) == {"id", "title", "created_at", "updated_at", "message_count"}
+
+    async def test_large_list_is_streamed_but_not_cached(self, client, fake_redis, monkeypatch):
+        monkeypatch.setattr(threads, "THREADS_CACHE_MAX_BYTES", 64)
+        for i in range(3):
+            await _new_thread(client, f"t{i}")
+
+        response = await client.get("/threads")
+
+        assert len(response.json()) == 3
+        assert threads._LIST_KEY not in fake_redis.data
+
+
+@pytest.mark.asyncio
+class TestThreadSummaries:
+
+    async def test_message_count_per_thread(self, client):
+        empty = await _new_thread(client, "empty")
+        single = await _new_thread(client, "single")
+        bulk = await _new_thread(client, "bulk")
+        await client.post(f"/threads/{single['id']}/messages",
+                          json={"content": "hi", "type": "user"})
+        await client.post(f"/threads/{bulk['id']}/messages:batch",
+                          json=[{"content": str(i), "type": "user"} for i in range(3)])
+
+        counts = {t["id"]: t["message_count"] for t in (await client.get("/threads")).json()}
+
+        assert counts == {empty["id"]: 0, single["id"]: 1, bulk["id"]: 3}
+
+    async def test_new_message_moves_thread_to_top(self, client):
+        older = await _new_thread(client, "older")
+        await _new_thread(client, "newer")
+
+        await client.post(f"/threads/{older['id']}/messages",
+                          json={"content": "bump", "type": "assistant"})
+
+        assert [t["title"] for t in (await client.get("/threads")).json()] == ["older", "newer"]
+
+
+@pytest.mark.asyncio
+class TestAddMessage:
+
+    async def test_add_message_returns_stored_message(self, client):
+        thread = await _new_thread(client, "Chat")
+
+        response = await client.post(f"/threads/{thread['id']}/messages", json={
+            "content": "hi", "type": "user", "sources": [{"id": "d1"}]})
+
+        assert response.status_code == 200
+        created = response.json()
+        stored = (await client.get(f"/threads/{thread['id']}")).json()["messages"]
+        assert stored == [created]
+        assert created["sources"] == [{"id": "d1"}]
+
+    @pytest.mark.parametrize("thread_id", [str(uuid.uuid4()), "not-a-uuid"])
+    async def test_add_message_unknown_thread_is_404(self, client, thread_id):
+        response = await client.post(f"/threads/{thread_id}/messages",
+                                     json={"content": "hi", "type": "user"})
+
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize("method", ["get", "put", "delete"])
+    async def test_malformed_thread_id_is_404(self, client, method):
+        response = await client.request(method, "/threads/not-a-uuid", json={"title": "x"})
+
+        assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+class TestThreadTitles:
+
+    @pytest.mark.parametrize("content,title", [
+        ("short question", "short question"),
+        ("y" * 50, "y" * 50),
+        ("z" * 51, "z" * 47 + "..."),
+    ])
+    async def test_first_user_message_names_default_thread(self, client, content, title):
+        thread = await _new_thread(client)
+
+        await client.post(f"/threads/{thread['id']}/messages",
+                          json={"content": content, "type": "user"})
+
+        assert (await client.get(f"/threads/{thread['id']}")).json()["title"] == title
+
+    async def test_assistant_message_keeps_default_title(self, client):
+        thread = await _new_thread(client)
+
+        await client.post(f"/threads/{thread['id']}/messages",
+                          json={"content": "Hello!", "type": "assistant"})
+
+        assert (await client.get(f"/threads/{thread['id']}")).json()["title"] == "New Chat"
+
+
+@pytest.mark.asyncio
+class TestUpdateThread:
+
+    async def test_rename_returns_thread_with_messages(self, client):
+        thread = await _new_thread(client, "Old")
+        await client.post(f"/threads/{thread['id']}/messages:batch",
+                          json=[{"content": "a", "type": "user"},
+                                {"content": "b", "type": "assistant"}])
+
+        response = await client.put(f"/threads/{thread['id']}", json={"title": "New"})
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["title"] == "New"
+        assert datetime.fromisoformat(data["updated_at"]) > datetime.fromisoformat(thread["updated_at"])
+        assert [m["content"] for m in data["messages"]] == ["a", "b"]
+        assert data["messages"] == (await client.get(f"/threads/{thread['id']}")).json()["messages"]
+
+    async def test_rename_unknown_thread_is_404(self, client):
+        response = await client.put(f"/threads/{uuid.uuid4()}", json={"title": "New"})
+
+        assert response.status_code == 404
+
+    async def test_empty_update_is_400(self, client):
+        thread = await _new_thread(client)
+
+        response = await client.put(f"/threads/{thread['id']}", json={})
+
+        assert response.status_code == 400
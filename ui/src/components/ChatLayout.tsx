@@ -28,15 +28,17 @@ export default function ChatLayout({ initialThreadId }: ChatLayoutProps) {
                 setThreads(loadedThreads);
                 setIsLoaded(true);
 
-                // If initialThreadId is provided, select that thread
-                if (initialThreadId) {
-                    const thread = loadedThreads.find(t => t.id === initialThreadId);
+                // If initialThreadId is provided, select that thread,
+                // otherwise the most recent one; list entries carry no
+                // messages, so the full thread is fetched
+                const selectedId = initialThreadId
+                    ? loadedThreads.find(t => t.id === initialThreadId)?.id
+                    : loadedThreads[0]?.id;
+                if (selectedId) {
+                    const thread = await storage.getThread(selectedId);
                     if (thread) {
                         setCurrentThread(thread);
                     }
-                } else if (loadedThreads.length > 0) {
-                    // Select the most recent thread if available
-                    setCurrentThread(loadedThreads[0]);
                 }
             } catch (error) {
                 console.error('Error loading threads:', error);
@@ -91,7 +93,10 @@ export default function ChatLayout({ initialThreadId }: ChatLayoutProps) {
 
             // If the deleted thread was current, select another one or clear
             if (currentThread?.id === threadId) {
-                setCurrentThread(updatedThreads.length > 0 ? updatedThreads[0] : undefined);
+                const next = updatedThreads.length > 0
+                    ? await storage.getThread(updatedThreads[0].id)
+                    : null;
+                setCurrentThread(next || undefined);
             }
         } catch (error) {
             console.error('Error deleting thread:', error);
@@ -11,16 +11,14 @@ export const storage = {
 
         if (USE_DATABASE) {
             try {
+                // List entries are summaries; messages load via getThread()
                 const threads = await threadsAPI.getAll();
                 return threads.map((thread: Record<string, unknown>) => ({
                     ...thread,
                     createdAt: new Date((thread.createdAt || thread.created_at) as string),
                     updatedAt: new Date((thread.updatedAt || thread.updated_at) as string),
-                    messages: (thread.messages as Record<string, unknown>[] || []).map((msg: Record<string, unknown>) => ({
-                        ...msg,
-                        threadId: msg.threadId || msg.thread_id,
-                        timestamp: new Date(msg.timestamp as string),
-                    })),
+                    messageCount: (thread.messageCount ?? thread.message_count) as number,
+                    messages: [],
                 }));
             } catch (error) {
                 console.error('Error loading threads from database:', error);
@@ -4,6 +4,7 @@ export interface Thread {
     createdAt: Date;
     updatedAt: Date;
     messages: Message[];
+    messageCount?: number; // set on list entries, whose messages are not loaded
 }
 
 export interface Message {